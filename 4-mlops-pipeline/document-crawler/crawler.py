@@ -5,20 +5,33 @@ Scalable web crawler for document ingestion with cloud integration
 """
 
 import asyncio
-import json
 import logging
+import mimetypes
+import multiprocessing
 import os
+import posixpath
+import queue
+import re
+import tempfile
 import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Set
-from urllib.parse import urljoin, urlparse
-import hashlib
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple, Union
+from functools import lru_cache, partial
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 import aiohttp
 import boto3
-from botocore.exceptions import ClientError
-from playwright.async_api import async_playwright, Browser, Page
+from boto3.s3.transfer import TransferConfig
+import lxml.html
+import orjson
+import xxhash
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from playwright.async_api import async_playwright, Browser, BrowserContext
 import yaml
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
 
 # Configure logging
@@ -28,6 +41,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'DocumentCrawler/1.0 (+https://example.com/bot)'
+
+# CloudWatch metric name for each crawl counter
+COUNTER_METRICS = {
+    'pages_crawled': 'Pagescrawled',
+    'documents_found': 'DocumentsFound',
+    'documents_processed': 'DocumentsProcessed',
+    'errors_count': 'ErrorsCount'
+}
+
+# Query parameters that never change page content (utm_* is matched by prefix)
+TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid'})
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Content types accepted for any document, and those that mark a page rather than a document
+OCTET_STREAM_TYPES = frozenset({'application/octet-stream', 'binary/octet-stream'})
+HTML_TYPES = frozenset({'text/html', 'application/xhtml+xml'})
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially equivalent forms dedup to one entry"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    
+    # Lowercase host and drop default ports
+    host = parts.hostname or ''
+    if ':' in host:
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    
+    # Collapse dot segments and trailing slashes
+    path = posixpath.normpath(parts.path) if parts.path else '/'
+    
+    # Drop tracking parameters and sort the rest
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ))
+    
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+@lru_cache(maxsize=100_000)
+def url_hostname(url: str) -> str:
+    """Lowercased hostname of a URL, cached since links repeat across pages"""
+    return urlsplit(url).hostname or ''
+
+def host_shard(host: str, shard_count: int) -> int:
+    """Stable shard index for a hostname (built-in hash() is salted per process)"""
+    return zlib.crc32(host.encode()) % shard_count
+
 @dataclass
 class CrawlConfig:
     """Configuration for crawler instance"""
@@ -42,6 +108,10 @@ class CrawlConfig:
     exclude_patterns: List[str] = None
     s3_bucket: str = None
     sqs_queue_url: str = None
+    metrics_interval: float = 60.0
+    max_document_bytes: int = 500 * 1024 * 1024
+    shard_index: int = 0
+    shard_count: int = 1
     
     def __post_init__(self):
         if self.document_extensions is None:
@@ -49,29 +119,100 @@ class CrawlConfig:
         if self.exclude_patterns is None:
             self.exclude_patterns = ['login', 'admin', 'auth', 'private']
 
+@dataclass
+class ShardChannels:
+    """Cross-process state shared by the shards of one crawl"""
+    inboxes: List[Any]   # one multiprocessing.Queue of forwarded (url, depth) per shard
+    pending: Any         # multiprocessing.Value counting seeding tokens and unfinished URLs
+    pages_queued: Any    # multiprocessing.Value counting pages queued by every shard, for max_pages
+    abort: Any           # multiprocessing.Event set when any shard fails
+
+class HashSet:
+    """Set of 64-bit hashes split into 256 shards by their top byte
+    
+    Each shard stays small enough to remain cache-resident, so lookups in the
+    URL dedup hot path touch far fewer cache lines than one huge set.
+    """
+    
+    def __init__(self):
+        self._shards: List[Set[int]] = [set() for _ in range(256)]
+        
+    def __contains__(self, value: int) -> bool:
+        return value in self._shards[value >> 56]
+        
+    def add(self, value: int):
+        self._shards[value >> 56].add(value)
+        
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
 class DocumentCrawler:
     """Production-ready document crawler with cloud integration"""
     
-    def __init__(self, config: CrawlConfig):
+    def __init__(self, config: CrawlConfig, channels: Optional[ShardChannels] = None):
         self.config = config
-        self.visited_urls: Set[str] = set()
-        self.processed_documents: Set[str] = set()
+        # Links to hosts owned by another shard are forwarded through its inbox
+        self.channels = channels if config.shard_count > 1 else None
+        # Seen URLs are tracked by 64-bit hash of their canonical form
+        self.visited_urls = HashSet()
+        self.processed_documents = HashSet()
         self.failed_urls: Set[str] = set()
         self.session: Optional[aiohttp.ClientSession] = None
         self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self.contexts: List[BrowserContext] = []
+        
+        # Allowed domains match the host exactly or as a dot-separated suffix
+        self._allowed_domains = frozenset(
+            domain.lower().strip('.') for domain in config.allowed_domains
+        )
+        
+        # URL filters compiled once; '(?!)' never matches for empty lists
+        self._exclude_re = re.compile(
+            '|'.join(map(re.escape, config.exclude_patterns)) or '(?!)',
+            re.IGNORECASE
+        )
+        self._document_re = re.compile(
+            r'\.(?:' + '|'.join(re.escape(ext.lstrip('.')) for ext in config.document_extensions) + r')(?:[?#]|$)'
+            if config.document_extensions else '(?!)',
+            re.IGNORECASE
+        )
         
-        # AWS clients
-        self.s3_client = boto3.client('s3')
-        self.sqs_client = boto3.client('sqs')
-        self.cloudwatch = boto3.client('cloudwatch')
+        # Pool of idle Playwright pages, one per browser context
+        self.pages: asyncio.Queue = asyncio.Queue()
         
-        # Metrics
+        # Work queue of (url, depth) and global bound on in-flight fetches
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.pages_queued = 0
+        self.semaphore = asyncio.Semaphore(config.concurrent_requests)
+        
+        # AWS clients, with connection pools sized to the boto3 thread pool
+        boto_config = Config(max_pool_connections=32)
+        self.s3_client = boto3.client('s3', config=boto_config)
+        self.sqs_client = boto3.client('sqs', config=boto_config)
+        self.cloudwatch = boto3.client('cloudwatch', config=boto_config)
+        
+        # Blocking boto3 calls run on a bounded pool, off the event loop
+        self._boto_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix='boto3')
+        
+        # Multipart uploads for large documents
+        self.transfer_config = TransferConfig(
+            multipart_threshold=16 * 1024 * 1024,
+            multipart_chunksize=32 * 1024 * 1024,
+            max_concurrency=10,
+            use_threads=True
+        )
+        
+        # SQS messages are buffered and sent in batches of up to 10
+        self._sqs_buffer: List[Dict] = []
+        self._sqs_flush_task: Optional[asyncio.Task] = None
+        
+        # Metrics: running totals, last published snapshot and fetch latencies
         self.start_time = time.time()
-        self.pages_crawled = 0
-        self.documents_found = 0
-        self.documents_processed = 0
-        self.errors_count = 0
+        self.stats: Counter = Counter()
+        self._published_stats: Counter = Counter()
+        self._fetch_latencies: List[float] = []
+        self._metrics_task: Optional[asyncio.Task] = None
+        self._metrics_stop = asyncio.Event()
         
     async def __aenter__(self):
         """Async context manager entry"""
@@ -86,9 +227,22 @@ class DocumentCrawler:
         """Initialize crawler resources"""
         logger.info(f"Initializing crawler for {self.config.name}")
         
-        # Initialize HTTP session
+        # Initialize HTTP session with pooled keep-alive connections and DNS cache
         timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(timeout=timeout)
+        connector = aiohttp.TCPConnector(
+            limit=1024,
+            limit_per_host=16,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            resolver=aiohttp.AsyncResolver(),
+            keepalive_timeout=60
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={'User-Agent': USER_AGENT},
+            auto_decompress=True
+        )
         
         # Initialize Playwright browser
         playwright = await async_playwright().start()
@@ -102,11 +256,18 @@ class DocumentCrawler:
             ]
         )
         
-        # Create a persistent page
-        self.page = await self.browser.new_page()
-        await self.page.set_extra_http_headers({
-            'User-Agent': 'DocumentCrawler/1.0 (+https://example.com/bot)'
-        })
+        # Create a pool of isolated contexts, each with a persistent page
+        for _ in range(self.config.concurrent_requests):
+            context = await self.browser.new_context(user_agent=USER_AGENT)
+            self.contexts.append(context)
+            self.pages.put_nowait(await context.new_page())
+        
+        # Start background SQS batch flusher
+        if self.config.sqs_queue_url:
+            self._sqs_flush_task = asyncio.create_task(self._sqs_flush_loop())
+            
+        # Start periodic metrics publisher
+        self._metrics_task = asyncio.create_task(self._metrics_loop())
         
         logger.info("Crawler initialized successfully")
         
@@ -114,11 +275,23 @@ class DocumentCrawler:
         """Clean up resources"""
         logger.info("Cleaning up crawler resources")
         
+        # Stop the background flusher and send any remaining messages
+        if self._sqs_flush_task:
+            self._sqs_flush_task.cancel()
+            await asyncio.gather(self._sqs_flush_task, return_exceptions=True)
+        await self.flush_sqs()
+        
+        # Stop the publisher between publishes; cancelling one mid-call would
+        # leave its deltas unrecorded and the final publish would resend them
+        if self._metrics_task:
+            self._metrics_stop.set()
+            await asyncio.gather(self._metrics_task, return_exceptions=True)
+        
         if self.session:
             await self.session.close()
             
-        if self.page:
-            await self.page.close()
+        for context in self.contexts:
+            await context.close()
             
         if self.browser:
             await self.browser.close()
@@ -126,21 +299,37 @@ class DocumentCrawler:
         # Publish final metrics
         await self.publish_metrics()
         
+        self._boto_pool.shutdown(wait=True)
+        
+    async def _run(self, fn, *args, **kwargs):
+        """Run a blocking boto3 call on the boto3 thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._boto_pool, partial(fn, *args, **kwargs)
+        )
+        
     async def crawl(self) -> Dict:
         """Main crawling method"""
         logger.info(f"Starting crawl for {self.config.name}")
         
+        # Fixed pool of workers drains the queue
+        workers = [
+            asyncio.create_task(self.worker())
+            for _ in range(self.config.concurrent_requests)
+        ]
+        if self.channels:
+            workers.append(asyncio.create_task(self._inbox_loop()))
+        
         try:
-            # Process each start URL
-            tasks = []
+            # Seed the queue with start URLs; other shards' hosts are forwarded
             for url in self.config.start_urls:
-                task = asyncio.create_task(
-                    self.crawl_url(url, depth=0)
-                )
-                tasks.append(task)
+                self.enqueue(url, 0)
                 
-            # Wait for all tasks to complete
-            await asyncio.gather(*tasks, return_exceptions=True)
+            # Wait until every queued URL has been processed, by every shard
+            if self.channels:
+                self._add_pending(-1)
+                await self._wait_for_shards()
+            else:
+                await self.queue.join()
             
             # Generate summary report
             summary = await self.generate_summary()
@@ -150,161 +339,255 @@ class DocumentCrawler:
             
         except Exception as e:
             logger.error(f"Crawl failed: {str(e)}")
-            self.errors_count += 1
+            self.stats['errors_count'] += 1
             raise
             
-    async def crawl_url(self, url: str, depth: int = 0):
-        """Crawl a single URL and extract documents/links"""
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            
+    def enqueue(self, url: str, depth: int):
+        """Queue a URL for crawling if it passes depth, dedup and scope checks
         
-        # Check depth and visited status
+        Filtering here rather than in the worker keeps duplicates and
+        out-of-scope links out of the queue entirely.
+        """
+        # Check depth
         if depth > self.config.max_depth:
             return
             
-        if url in self.visited_urls:
+        # Skip excluded patterns
+        if self._exclude_re.search(url):
+            logger.debug(f"Skipping excluded URL: {url}")
             return
             
-        # Check if we've reached max pages
-        if len(self.visited_urls) >= self.config.max_pages:
+        # Check domain restrictions against every suffix of the host
+        host = url_hostname(url)
+        labels = host.split('.')
+        if not any('.'.join(labels[i:]) in self._allowed_domains for i in range(len(labels))):
+            logger.debug(f"Skipping URL outside allowed domains: {url}")
             return
             
-        # Skip excluded patterns
-        if any(pattern in url.lower() for pattern in self.config.exclude_patterns):
-            logger.debug(f"Skipping excluded URL: {url}")
+        # Check visited status; in a sharded crawl this also forwards each URL once
+        url_hash = xxhash.xxh3_64_intdigest(canonicalize_url(url).encode())
+        if url_hash in self.visited_urls:
             return
             
-        # Check domain restrictions
-        parsed_url = urlparse(url)
-        if not any(domain in parsed_url.netloc for domain in self.config.allowed_domains):
-            logger.debug(f"Skipping URL outside allowed domains: {url}")
+        # In a sharded crawl each host is owned by exactly one process
+        if self.channels:
+            owner = host_shard(host, self.config.shard_count)
+            if owner != self.config.shard_index:
+                self.visited_urls.add(url_hash)
+                self._add_pending(1)
+                self.channels.inboxes[owner].put((url, depth))
+                logger.debug(f"Forwarded URL to shard {owner}: {url}")
+                return
+                
+        # Check max pages, a budget shared by every shard
+        if self.channels:
+            with self.channels.pages_queued.get_lock():
+                if self.channels.pages_queued.value >= self.config.max_pages:
+                    return
+                self.channels.pages_queued.value += 1
+        elif self.pages_queued >= self.config.max_pages:
             return
             
-        self.visited_urls.add(url)
+        self.visited_urls.add(url_hash)
+        self.pages_queued += 1
+        if self.channels:
+            self._add_pending(1)
+        self.queue.put_nowait((url, depth))
+        
+    async def worker(self):
+        """Consume (url, depth) items from the crawl queue until cancelled"""
+        while True:
+            url, depth = await self.queue.get()
+            try:
+                await self.crawl_url(url, depth)
+            finally:
+                self.queue.task_done()
+                if self.channels:
+                    self._add_pending(-1)
+                    
+    async def _inbox_loop(self):
+        """Enqueue URLs forwarded by other shards until cancelled"""
+        inbox = self.channels.inboxes[self.config.shard_index]
+        while True:
+            try:
+                url, depth = inbox.get_nowait()
+            except queue.Empty:
+                await asyncio.sleep(0.05)
+                continue
+            try:
+                self.enqueue(url, depth)
+            finally:
+                # Any URL accepted above holds its own count
+                self._add_pending(-1)
+                
+    def _add_pending(self, delta: int):
+        """Adjust the crawl-wide count of unfinished URLs"""
+        with self.channels.pending.get_lock():
+            self.channels.pending.value += delta
+            
+    async def _wait_for_shards(self):
+        """Wait until no shard has queued, forwarded or in-flight URLs left"""
+        while self.channels.pending.value > 0:
+            if self.channels.abort.is_set():
+                raise RuntimeError("Another shard failed, aborting crawl")
+            await asyncio.sleep(0.1)
+                
+    async def crawl_url(self, url: str, depth: int = 0):
+        """Crawl a single queued URL, process its documents and enqueue its links"""
         logger.info(f"Crawling URL (depth {depth}): {url}")
         
         try:
-            # Navigate to page with Playwright
-            await self.page.goto(url, wait_until='networkidle', timeout=30000)
-            self.pages_crawled += 1
-            
-            # Extract document links
-            document_links = await self.extract_document_links()
+            # Fetch static HTML first, render with Playwright only when needed
+            fetch_start = time.monotonic()
+            links = await self.fetch_links(url)
+            if links is None:
+                links = await self.render_links(url)
+            self._fetch_latencies.append(time.monotonic() - fetch_start)
+            document_links, page_links = links
+            self.stats['pages_crawled'] += 1
+            self.stats['documents_found'] += len(document_links)
+            
+            # Process document links; a malformed link only skips itself
             for doc_link in document_links:
-                absolute_url = urljoin(url, doc_link)
-                await self.process_document(absolute_url)
+                try:
+                    await self.process_document(urljoin(url, doc_link))
+                except ValueError:
+                    logger.debug(f"Skipping malformed document link on {url}: {doc_link}")
                 
-            # Extract page links for further crawling
+            # Enqueue page links for further crawling
             if depth < self.config.max_depth:
-                page_links = await self.extract_page_links()
-                
-                # Create tasks for concurrent crawling
-                tasks = []
-                for link in page_links[:self.config.concurrent_requests]:
-                    absolute_url = urljoin(url, link)
-                    task = asyncio.create_task(
-                        self.crawl_url(absolute_url, depth + 1)
-                    )
-                    tasks.append(task)
-                    
-                # Wait between batches
-                await asyncio.sleep(self.config.delay_between_requests)
-                
-                # Process batch
-                if tasks:
-                    await asyncio.gather(*tasks, return_exceptions=True)
+                for link in page_links:
+                    try:
+                        self.enqueue(urljoin(url, link), depth + 1)
+                    except ValueError:
+                        logger.debug(f"Skipping malformed link on {url}: {link}")
                     
+            # Respectful delay before this worker picks up its next URL
+            await asyncio.sleep(self.config.delay_between_requests)
+            
         except Exception as e:
             logger.error(f"Error crawling {url}: {str(e)}")
             self.failed_urls.add(url)
-            self.errors_count += 1
+            self.stats['errors_count'] += 1
             
-    async def extract_document_links(self) -> List[str]:
-        """Extract document links from current page"""
-        try:
-            # Get all links with document extensions
-            links = []
-            
-            # Extract from href attributes
-            href_links = await self.page.evaluate('''
-                () => {
-                    const links = Array.from(document.querySelectorAll('a[href]'));
-                    return links.map(link => link.href);
-                }
-            ''')
-            
-            # Filter for document extensions
-            for link in href_links:
-                if any(link.lower().endswith(ext) for ext in self.config.document_extensions):
-                    links.append(link)
-                    
-            # Extract from embedded documents (iframes, objects, etc.)
-            embedded_docs = await self.page.evaluate('''
-                () => {
-                    const elements = Array.from(document.querySelectorAll('iframe[src], object[data], embed[src]'));
-                    return elements.map(el => el.src || el.data);
-                }
-            ''')
-            
-            for doc in embedded_docs:
-                if doc and any(doc.lower().endswith(ext) for ext in self.config.document_extensions):
-                    links.append(doc)
-                    
-            self.documents_found += len(links)
-            logger.debug(f"Found {len(links)} document links")
-            
-            return links
-            
-        except Exception as e:
-            logger.error(f"Error extracting document links: {str(e)}")
-            return []
-            
-    async def extract_page_links(self) -> List[str]:
-        """Extract page links for further crawling"""
+    async def fetch_links(self, url: str) -> Optional[Tuple[List[str], List[str]]]:
+        """Fetch a page over HTTP and extract links from its static HTML
+        
+        Returns None when the HTML contains no links, which usually means the
+        page is rendered client-side and needs a browser.
+        """
+        async with self.semaphore, self.session.get(url) as response:
+            response.raise_for_status()
+            content_type = response.headers.get('content-type', '')
+            if 'html' not in content_type:
+                logger.debug(f"Skipping non-HTML page {url}: {content_type}")
+                return [], []
+            body = await response.read()
+            base_url = str(response.url)
+            
+        document_links, page_links = await self.extract_links(body, base_url)
+        if not document_links and not page_links:
+            return None
+        return document_links, page_links
+        
+    async def extract_links(self, body: Union[str, bytes], base_url: str) -> Tuple[List[str], List[str]]:
+        """Parse links inline, or in a worker thread for pages over 1 MiB"""
+        if len(body) > 1024 * 1024:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.parse_links, body, base_url
+            )
+        return self.parse_links(body, base_url)
+        
+    def parse_links(self, body: Union[str, bytes], base_url: str) -> Tuple[List[str], List[str]]:
+        """Extract document and page links from HTML with lxml
+        
+        Raw bytes are decoded by lxml using the page's declared charset; an
+        already decoded str is parsed as is.
+        """
+        if not body.strip():
+            return [], []
+            
+        root = lxml.html.fromstring(body)
+        # Drop hrefs that can't be resolved (e.g. http://[bad) instead of losing the page
+        root.make_links_absolute(base_url, handle_failures='discard')
+        
+        document_links = [
+            link for link in root.xpath('//a/@href | //iframe/@src | //object/@data | //embed/@src')
+            if self._document_re.search(link)
+        ]
+                
+        page_links = [
+            href for href in root.xpath('//a/@href')
+            if not href.startswith(('mailto:', 'tel:', 'javascript:'))
+        ]
+        
+        logger.debug(f"Found {len(document_links)} document links and {len(page_links)} page links")
+        return document_links, page_links
+        
+    async def render_links(self, url: str) -> Tuple[List[str], List[str]]:
+        """Render a page with Playwright and extract links from the rendered HTML"""
+        page = await self.pages.get()
         try:
-            links = await self.page.evaluate('''
-                () => {
-                    const links = Array.from(document.querySelectorAll('a[href]'));
-                    return links
-                        .map(link => link.href)
-                        .filter(href => href && !href.startsWith('mailto:') && !href.startsWith('tel:'))
-                        .slice(0, 50); // Limit to prevent memory issues
-                }
-            ''')
-            
-            logger.debug(f"Found {len(links)} page links")
-            return links
-            
-        except Exception as e:
-            logger.error(f"Error extracting page links: {str(e)}")
-            return []
-            
+            async with self.semaphore:
+                await page.goto(url, wait_until='networkidle', timeout=30000)
+                html = await page.content()
+                base_url = page.url
+        finally:
+            self.pages.put_nowait(page)
+        # page.content() is already decoded; re-encoding it would let lxml apply
+        # the page's <meta charset> a second time
+        return await self.extract_links(html, base_url)
+        
     async def process_document(self, url: str):
         """Process a document URL - download and queue for processing"""
         
-        if url in self.processed_documents:
+        # One 128-bit hash serves as the S3 key; its top 64 bits dedup
+        url_digest = xxhash.xxh3_128_intdigest(canonicalize_url(url).encode())
+        if url_digest >> 64 in self.processed_documents:
             return
             
-        self.processed_documents.add(url)
+        self.processed_documents.add(url_digest >> 64)
         logger.info(f"Processing document: {url}")
         
         try:
-            # Generate unique key for document
-            url_hash = hashlib.md5(url.encode()).hexdigest()
-            document_key = f"documents/{self.config.name}/{url_hash}"
+            # Generate unique key for document from the dedup digest
+            document_key = f"documents/{self.config.name}/{url_digest:032x}"
+            timestamp = datetime.now().isoformat()
             
+            # Skip mislinked or oversized documents before downloading them
+            if not await self.probe_document(url):
+                return
+                
             # Download document content
-            async with self.session.get(url) as response:
+            async with self.semaphore, self.session.get(url) as response:
                 if response.status == 200:
-                    content = await response.read()
                     content_type = response.headers.get('content-type', 'application/octet-stream')
                     
-                    # Upload to S3 if configured
-                    if self.config.s3_bucket:
-                        await self.upload_to_s3(
-                            content, 
-                            document_key, 
-                            content_type,
-                            url
-                        )
+                    # Stream body into a spool that moves to disk past 16 MiB
+                    with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as spool:
+                        # Headers may omit or understate the size, so enforce the limit here too
+                        async for chunk in response.content.iter_chunked(1024 * 1024):
+                            spool.write(chunk)
+                            if spool.tell() > self.config.max_document_bytes:
+                                logger.info(f"Skipping document {url}: body exceeds {self.config.max_document_bytes} bytes")
+                                return
+                        size = spool.tell()
+                        spool.seek(0)
+                        
+                        # Upload to S3 if configured
+                        if self.config.s3_bucket:
+                            await self.upload_to_s3(
+                                spool, 
+                                document_key, 
+                                content_type,
+                                url,
+                                timestamp
+                            )
                         
                     # Send processing message to SQS if configured
                     if self.config.sqs_queue_url:
@@ -312,12 +595,12 @@ class DocumentCrawler:
                             'document_key': document_key,
                             'source_url': url,
                             'content_type': content_type,
-                            'size': len(content),
+                            'size': size,
                             'crawler_name': self.config.name,
-                            'timestamp': datetime.now().isoformat()
+                            'timestamp': timestamp
                         })
                         
-                    self.documents_processed += 1
+                    self.stats['documents_processed'] += 1
                     logger.info(f"Successfully processed document: {url}")
                     
                 else:
@@ -325,105 +608,187 @@ class DocumentCrawler:
                     
         except Exception as e:
             logger.error(f"Error processing document {url}: {str(e)}")
-            self.errors_count += 1
+            self.stats['errors_count'] += 1
             
-    async def upload_to_s3(self, content: bytes, key: str, content_type: str, source_url: str):
-        """Upload document content to S3"""
+    async def probe_document(self, url: str) -> bool:
+        """Check a document's type and size with HEAD before the full GET
+        
+        Servers that reject HEAD are probed with a one-byte range request.
+        Returns True when the document should be downloaded.
+        """
+        async with self.semaphore:
+            async with self.session.head(url, allow_redirects=True) as response:
+                status, headers = response.status, response.headers
+                
+            if status in (405, 501):
+                async with self.session.get(url, headers={'Range': 'bytes=0-0'}) as response:
+                    status, headers = response.status, response.headers
+                    
+        # Let the GET report errors; only reject on headers we can trust
+        if status >= 400:
+            return True
+            
+        # Compare against the link's own extension, so a .pdf that redirects to HTML is rejected
+        content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+        expected_type, _ = mimetypes.guess_type(urlsplit(url).path)
+        if expected_type:
+            accepted = content_type in OCTET_STREAM_TYPES or content_type == expected_type
+        else:
+            accepted = content_type not in HTML_TYPES
+        if content_type and not accepted:
+            logger.info(f"Skipping document {url}: unexpected content type {content_type}")
+            return False
+            
+        # A 206 reply carries the full size after the slash in Content-Range
+        if status == 206:
+            size = headers.get('content-range', '').rpartition('/')[2]
+        else:
+            size = headers.get('content-length', '')
+        if size.isdigit() and int(size) > self.config.max_document_bytes:
+            logger.info(f"Skipping document {url}: {size} bytes exceeds limit")
+            return False
+            
+        return True
+        
+    async def upload_to_s3(self, fileobj: BinaryIO, key: str, content_type: str, source_url: str, timestamp: str):
+        """Upload document content from a file-like object to S3"""
         try:
-            self.s3_client.put_object(
+            await self._run(
+                self.s3_client.upload_fileobj,
+                fileobj,
                 Bucket=self.config.s3_bucket,
                 Key=key,
-                Body=content,
-                ContentType=content_type,
-                Metadata={
-                    'source-url': source_url,
-                    'crawler-name': self.config.name,
-                    'upload-timestamp': datetime.now().isoformat()
-                },
-                ServerSideEncryption='AES256'
+                Config=self.transfer_config,
+                ExtraArgs={
+                    'ContentType': content_type,
+                    'Metadata': {
+                        'source-url': source_url,
+                        'crawler-name': self.config.name,
+                        'upload-timestamp': timestamp
+                    },
+                    'ServerSideEncryption': 'AES256'
+                }
             )
             logger.debug(f"Uploaded to S3: s3://{self.config.s3_bucket}/{key}")
             
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             logger.error(f"Failed to upload to S3: {str(e)}")
             raise
             
     async def send_processing_message(self, message: Dict):
-        """Send message to SQS queue for document processing"""
-        try:
-            self.sqs_client.send_message(
-                QueueUrl=self.config.sqs_queue_url,
-                MessageBody=json.dumps(message),
-                MessageAttributes={
-                    'crawler_name': {
-                        'StringValue': self.config.name,
-                        'DataType': 'String'
-                    },
-                    'document_type': {
-                        'StringValue': message.get('content_type', 'unknown'),
-                        'DataType': 'String'
+        """Queue message for batched delivery to SQS"""
+        self._sqs_buffer.append(message)
+        if len(self._sqs_buffer) >= 10:
+            await self.flush_sqs()
+            
+    async def _sqs_flush_loop(self):
+        """Flush buffered SQS messages every 200ms"""
+        while True:
+            await asyncio.sleep(0.2)
+            await self.flush_sqs()
+            
+    async def flush_sqs(self):
+        """Send buffered messages to SQS with send_message_batch"""
+        while self._sqs_buffer:
+            batch = self._sqs_buffer[:10]
+            del self._sqs_buffer[:10]
+            
+            entries = [
+                {
+                    'Id': str(i),
+                    'MessageBody': orjson.dumps(message).decode(),
+                    'MessageAttributes': {
+                        'crawler_name': {
+                            'StringValue': self.config.name,
+                            'DataType': 'String'
+                        },
+                        'document_type': {
+                            'StringValue': message.get('content_type', 'unknown'),
+                            'DataType': 'String'
+                        }
                     }
                 }
-            )
-            logger.debug(f"Sent SQS message for document: {message['document_key']}")
+                for i, message in enumerate(batch)
+            ]
             
-        except ClientError as e:
-            logger.error(f"Failed to send SQS message: {str(e)}")
-            raise
+            try:
+                response = await self._run(
+                    self.sqs_client.send_message_batch,
+                    QueueUrl=self.config.sqs_queue_url,
+                    Entries=entries
+                )
+            except (ClientError, BotoCoreError) as e:
+                # Connection errors and timeouts must not end the background flusher
+                logger.error(f"Failed to send SQS batch of {len(batch)} messages: {str(e)}")
+                self.stats['errors_count'] += len(batch)
+                continue
+                
+            for failure in response.get('Failed', []):
+                message = batch[int(failure['Id'])]
+                logger.error(f"Failed to send SQS message for {message['document_key']}: {failure.get('Message')}")
+                self.stats['errors_count'] += 1
+                
+            logger.debug(f"Sent SQS batch of {len(batch)} messages")
+            
+    async def _metrics_loop(self):
+        """Publish metrics every metrics_interval seconds until stopped"""
+        while True:
+            try:
+                await asyncio.wait_for(self._metrics_stop.wait(), self.config.metrics_interval)
+                return
+            except asyncio.TimeoutError:
+                await self.publish_metrics()
             
     async def publish_metrics(self):
-        """Publish metrics to CloudWatch"""
+        """Publish counter deltas since the last publish to CloudWatch"""
         try:
             runtime = time.time() - self.start_time
+            dimensions = [{'Name': 'CrawlerName', 'Value': self.config.name}]
+            snapshot = self.stats.copy()
             
             metrics = [
                 {
-                    'MetricName': 'Pagescrawled',
-                    'Value': self.pages_crawled,
+                    'MetricName': metric_name,
+                    'Value': snapshot[counter] - self._published_stats[counter],
                     'Unit': 'Count',
-                    'Dimensions': [
-                        {'Name': 'CrawlerName', 'Value': self.config.name}
-                    ]
-                },
-                {
-                    'MetricName': 'DocumentsFound',
-                    'Value': self.documents_found,
-                    'Unit': 'Count',
-                    'Dimensions': [
-                        {'Name': 'CrawlerName', 'Value': self.config.name}
-                    ]
-                },
-                {
-                    'MetricName': 'DocumentsProcessed',
-                    'Value': self.documents_processed,
-                    'Unit': 'Count',
-                    'Dimensions': [
-                        {'Name': 'CrawlerName', 'Value': self.config.name}
-                    ]
-                },
-                {
-                    'MetricName': 'ErrorsCount',
-                    'Value': self.errors_count,
-                    'Unit': 'Count',
-                    'Dimensions': [
-                        {'Name': 'CrawlerName', 'Value': self.config.name}
-                    ]
-                },
-                {
-                    'MetricName': 'CrawlDuration',
-                    'Value': runtime,
-                    'Unit': 'Seconds',
-                    'Dimensions': [
-                        {'Name': 'CrawlerName', 'Value': self.config.name}
-                    ]
+                    'Dimensions': dimensions,
+                    'StorageResolution': 60
                 }
+                for counter, metric_name in COUNTER_METRICS.items()
             ]
-            
-            self.cloudwatch.put_metric_data(
-                Namespace='MLOps/DocumentCrawler',
-                MetricData=metrics
-            )
-            
+            metrics.append({
+                'MetricName': 'CrawlDuration',
+                'Value': runtime,
+                'Unit': 'Seconds',
+                'Dimensions': dimensions,
+                'StorageResolution': 60
+            })
+            
+            # Aggregate page fetch latencies into a single StatisticSet
+            latencies, self._fetch_latencies = self._fetch_latencies, []
+            if latencies:
+                metrics.append({
+                    'MetricName': 'PageFetchLatency',
+                    'StatisticValues': {
+                        'SampleCount': len(latencies),
+                        'Sum': sum(latencies),
+                        'Minimum': min(latencies),
+                        'Maximum': max(latencies)
+                    },
+                    'Unit': 'Seconds',
+                    'Dimensions': dimensions,
+                    'StorageResolution': 60
+                })
+                
+            # put_metric_data accepts at most 20 datapoints per call
+            for i in range(0, len(metrics), 20):
+                await self._run(
+                    self.cloudwatch.put_metric_data,
+                    Namespace='MLOps/DocumentCrawler',
+                    MetricData=metrics[i:i + 20]
+                )
+                
+            self._published_stats = snapshot
             logger.info("Published metrics to CloudWatch")
             
         except Exception as e:
@@ -438,12 +803,12 @@ class DocumentCrawler:
             'start_time': datetime.fromtimestamp(self.start_time).isoformat(),
             'end_time': datetime.now().isoformat(),
             'runtime_seconds': round(runtime, 2),
-            'pages_crawled': self.pages_crawled,
-            'documents_found': self.documents_found,
-            'documents_processed': self.documents_processed,
-            'errors_count': self.errors_count,
+            'pages_crawled': self.stats['pages_crawled'],
+            'documents_found': self.stats['documents_found'],
+            'documents_processed': self.stats['documents_processed'],
+            'errors_count': self.stats['errors_count'],
             'failed_urls': list(self.failed_urls),
-            'success_rate': round((self.documents_processed / max(self.documents_found, 1)) * 100, 2)
+            'success_rate': round((self.stats['documents_processed'] / max(self.stats['documents_found'], 1)) * 100, 2)
         }
 
 def load_config(config_path: str) -> CrawlConfig:
@@ -458,6 +823,36 @@ def load_config(config_path: str) -> CrawlConfig:
         logger.error(f"Failed to load config: {str(e)}")
         raise
 
+def shard_config(config: CrawlConfig, shard_count: int) -> List[CrawlConfig]:
+    """One config per shard; every shard seeds all start URLs and forwards the ones it doesn't own"""
+    return [
+        replace(config, shard_index=index, shard_count=shard_count)
+        for index in range(shard_count)
+    ]
+
+async def run_crawler(config: CrawlConfig, channels: Optional[ShardChannels] = None) -> Dict:
+    """Run one crawler to completion and return its summary"""
+    async with DocumentCrawler(config, channels) as crawler:
+        return await crawler.crawl()
+
+# Set in each shard process by init_shard_process
+_shard_channels: Optional[ShardChannels] = None
+
+def init_shard_process(channels: ShardChannels, log_level: str):
+    """Pool initializer; multiprocessing queues can only be handed over at spawn"""
+    global _shard_channels
+    _shard_channels = channels
+    logging.getLogger().setLevel(getattr(logging, log_level.upper()))
+
+def run_shard(config: CrawlConfig) -> Dict:
+    """Entry point for a shard running in its own process and event loop"""
+    try:
+        return asyncio.run(run_crawler(config, _shard_channels))
+    except BaseException:
+        # Don't leave the other shards waiting on this one's URLs
+        _shard_channels.abort.set()
+        raise
+
 async def main():
     """Main entry point for crawler"""
     import argparse
@@ -465,6 +860,8 @@ async def main():
     parser = argparse.ArgumentParser(description='Production Document Crawler')
     parser.add_argument('--config', required=True, help='Path to configuration file')
     parser.add_argument('--log-level', default='INFO', help='Logging level')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Number of crawler processes; hosts are partitioned across them')
     
     args = parser.parse_args()
     
@@ -474,11 +871,35 @@ async def main():
     # Load configuration
     config = load_config(args.config)
     
-    # Run crawler
-    async with DocumentCrawler(config) as crawler:
-        summary = await crawler.crawl()
+    # Run crawler, either in-process or as one process per shard
+    if args.shards > 1:
+        shards = shard_config(config, args.shards)
+        loop = asyncio.get_running_loop()
+        # Spawn rather than fork so children don't inherit this event loop
+        mp_context = multiprocessing.get_context('spawn')
+        channels = ShardChannels(
+            inboxes=[mp_context.Queue() for _ in shards],
+            # One seeding token per shard keeps the count above zero until all have started
+            pending=mp_context.Value('q', len(shards)),
+            pages_queued=mp_context.Value('q', 0),
+            abort=mp_context.Event()
+        )
+        # Every shard must run at once, so the pool has exactly one process per shard
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            mp_context=mp_context,
+            initializer=init_shard_process,
+            initargs=(channels, args.log_level)
+        ) as pool:
+            summaries = await asyncio.gather(*[
+                loop.run_in_executor(pool, run_shard, shard)
+                for shard in shards
+            ])
+    else:
+        summaries = [await run_crawler(config)]
         
-        # Print summary
+    # Print summary
+    for summary in summaries:
         print("\n" + "="*50)
         print("CRAWL SUMMARY")
         print("="*50)
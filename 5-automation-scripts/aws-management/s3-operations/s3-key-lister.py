@@ -5,17 +5,74 @@ Efficiently list and filter S3 objects based on various criteria
 Used for large-scale S3 auditing and data management operations
 """
 
+import asyncio
 import boto3
 import json
 import csv
+import gzip
 import argparse
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Generator
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from itertools import chain, count, groupby, islice, repeat
+from operator import attrgetter, itemgetter
+from typing import Callable, Iterable, List, Dict, NamedTuple, Optional, Generator, Set, Tuple
+from urllib.parse import unquote_plus, urlparse
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 import sys
 import os
 
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+try:
+    import msgspec
+    HAVE_MSGSPEC = True
+except ImportError:
+    HAVE_MSGSPEC = False
+
+try:
+    import aioboto3
+    from aiobotocore.config import AioConfig
+    HAVE_AIOBOTO3 = True
+except ImportError:
+    HAVE_AIOBOTO3 = False
+
+try:
+    import pyarrow.parquet as pq
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+# Upper bounds of the small (< 1MB) and medium (< 100MB) size buckets
+SIZE_BUCKET_BOUNDS = (1024 * 1024, 100 * 1024 * 1024)
+
+# Binary size units, indexed by bit_length() // 10
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# S3 Inventory CSV schema names and their Parquet/ORC column equivalents
+INVENTORY_COLUMNS = {
+    'Key': 'key',
+    'Size': 'size',
+    'LastModifiedDate': 'last_modified_date',
+    'ETag': 'e_tag',
+    'StorageClass': 'storage_class',
+    'IsLatest': 'is_latest',
+    'IsDeleteMarker': 'is_delete_marker'
+}
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,16 +80,88 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class S3Object(NamedTuple):
+    """Compact fixed-layout record for a listed S3 object"""
+    key: str
+    size: int
+    last_modified: datetime
+    # Formatted once when the record is built and shared by every exporter;
+    # None when the listing was asked to skip it
+    last_modified_iso: Optional[str]
+    storage_class: str
+    # None when the listing was asked to skip it
+    extension: Optional[str]
+    etag: Optional[str] = None
+    year: Optional[int] = None
+    
+    def to_dict(self) -> Dict:
+        """Dict form using the export field names, omitting unset fields"""
+        record = {
+            'Key': self.key,
+            'Size': self.size,
+            'LastModified': self.last_modified_iso,
+            'StorageClass': self.storage_class,
+            'Extension': self.extension
+        }
+        if self.etag is not None:
+            record['ETag'] = self.etag
+        if self.year is not None:
+            record['Year'] = self.year
+        return record
+
+if HAVE_MSGSPEC:
+    class S3ObjectJSON(msgspec.Struct, omit_defaults=True, rename={
+        'key': 'Key',
+        'size': 'Size',
+        'last_modified_iso': 'LastModified',
+        'storage_class': 'StorageClass',
+        'extension': 'Extension',
+        'etag': 'ETag',
+        'year': 'Year'
+    }):
+        """Encodes to the same object as S3Object.to_dict() without building a dict"""
+        key: str
+        size: int
+        last_modified_iso: Optional[str]
+        storage_class: str
+        extension: Optional[str]
+        etag: Optional[str] = None
+        year: Optional[int] = None
+
 class S3KeyLister:
     """Production-ready S3 object lister with filtering and export capabilities"""
     
-    def __init__(self, region: str = 'us-east-1', profile: Optional[str] = None):
+    def __init__(
+        self,
+        region: str = 'us-east-1',
+        profile: Optional[str] = None,
+        max_parallel_listings: int = 8,
+        use_async: bool = False,
+        parallel_prefixes: bool = False
+    ):
         """Initialize S3 client with optional profile"""
         try:
             session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-            self.s3_client = session.client('s3', region_name=region)
+            # Keep connections alive across pages and size the pool so
+            # parallel listings don't queue on sockets
+            config = Config(
+                max_pool_connections=max(32, max_parallel_listings),
+                tcp_keepalive=True,
+                retries={'max_attempts': 10, 'mode': 'adaptive'},
+                connect_timeout=5,
+                read_timeout=60
+            )
+            self.s3_client = session.client('s3', region_name=region, config=config)
             self.region = region
             self.profile = profile
+            self.max_parallel_listings = max_parallel_listings
+            self.parallel_prefixes = parallel_prefixes
+            
+            # Event-loop listing only pays off with many concurrent prefixes;
+            # for a handful of listings threaded boto3 is faster
+            self.use_async = use_async and HAVE_AIOBOTO3
+            if use_async and not HAVE_AIOBOTO3:
+                logger.warning("aioboto3 not installed, falling back to threaded listing")
             
             # Test credentials
             self.s3_client.list_buckets()
@@ -53,115 +182,548 @@ class S3KeyLister:
         start_year: int, 
         end_year: int,
         prefix: str = "",
-        extensions: Optional[List[str]] = None
-    ) -> List[Dict]:
+        extensions: Optional[List[str]] = None,
+        fields: Optional[Set[str]] = None
+    ) -> Generator[S3Object, None, None]:
         """
-        List S3 objects filtered by date range in path structure
+        Generator listing S3 objects filtered by date range in path structure
         Optimized for large buckets with year-based organization
+        fields names the optional record fields to fill, as for prefix listings
         """
         logger.info(f"Listing objects from {bucket_name} for years {start_year}-{end_year}")
         
         if extensions is None:
             extensions = ['.pdf', '.docx', '.txt', '.json', '.csv']
         
-        objects = []
+        # Lowercase the extensions once; each key is then matched with one endswith
+        # call, and ('',) matches every key when no extensions are given
+        ext_tuple = tuple({ext.lower() for ext in extensions}) if extensions else ('',)
+        
+        year_prefixes = [
+            (year, f"{prefix}{year}/" if prefix else f"{year}/")
+            for year in range(start_year, end_year + 1)
+        ]
+        
+        if self.use_async:
+            # A single producer drives every listing on one event loop
+            listings = [
+                (year_prefix, {}, partial(self._page_objects, year=year, ext_tuple=ext_tuple, fields=fields))
+                for year, year_prefix in year_prefixes
+            ]
+            producers = [partial(self._list_async, bucket_name, listings)]
+        else:
+            # One page producer per year prefix, listed concurrently
+            producers = [
+                partial(self._list_single_year, bucket_name, year, year_prefix, ext_tuple, fields)
+                for year, year_prefix in year_prefixes
+            ]
         
+        object_count = 0
         try:
-            # Use paginator for efficient handling of large buckets
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            
-            for year in range(start_year, end_year + 1):
-                year_prefix = f"{prefix}{year}/" if prefix else f"{year}/"
-                logger.info(f"Processing year: {year}")
-                
-                page_iterator = paginator.paginate(
-                    Bucket=bucket_name,
-                    Prefix=year_prefix
-                )
-                
-                year_count = 0
-                for page in page_iterator:
-                    if 'Contents' not in page:
-                        continue
-                        
-                    for obj in page['Contents']:
-                        key = obj['Key']
-                        
-                        # Parse path structure to extract year
-                        path_parts = key.split('/')
-                        if len(path_parts) > 1 and path_parts[-2].isdigit():
-                            object_year = int(path_parts[-2])
-                            if start_year <= object_year <= end_year:
-                                # Filter by extensions if specified
-                                if not extensions or any(key.lower().endswith(ext.lower()) for ext in extensions):
-                                    objects.append({
-                                        'Key': key,
-                                        'Size': obj['Size'],
-                                        'LastModified': obj['LastModified'],
-                                        'StorageClass': obj.get('StorageClass', 'STANDARD'),
-                                        'Year': object_year,
-                                        'Extension': self._get_file_extension(key)
-                                    })
-                                    year_count += 1
-                
-                logger.info(f"Found {year_count} objects for year {year}")
+            for obj in self._iter_parallel(producers):
+                object_count += 1
+                yield obj
         
         except ClientError as e:
             logger.error(f"Error listing objects from bucket {bucket_name}: {e}")
             raise
         
-        logger.info(f"Total objects found: {len(objects)}")
+        logger.info(f"Total objects found: {object_count}")
+    
+    def _list_single_year(
+        self,
+        bucket_name: str,
+        year: int,
+        year_prefix: str,
+        ext_tuple: Tuple[str, ...] = ('',),
+        fields: Optional[Set[str]] = None
+    ) -> Generator[List[S3Object], None, None]:
+        """Yield matching objects under one year prefix, one list per page"""
+        logger.info(f"Processing year: {year}")
+        
+        # Paginators are not thread-safe, so each worker creates its own
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        page_iterator = paginator.paginate(
+            Bucket=bucket_name,
+            Prefix=year_prefix,
+            PaginationConfig={'PageSize': 1000}
+        )
+        
+        year_count = 0
+        for page in page_iterator:
+            objects = self._page_objects(page, year, ext_tuple, fields)
+            year_count += len(objects)
+            yield objects
+        
+        logger.info(f"Found {year_count} objects for year {year}")
+    
+    def _list_async(
+        self,
+        bucket_name: str,
+        listings: List[Tuple[str, Dict, Callable[[Dict], List[S3Object]]]]
+    ) -> Generator[List[S3Object], None, None]:
+        """
+        Yield the records of every listing from a private event loop
+        Each listing is a (prefix, extra paginate arguments, page builder) tuple.
+        The loop only runs while waiting for the next page, which keeps backpressure
+        """
+        loop = asyncio.new_event_loop()
+        pages = asyncio.Queue(maxsize=self.max_parallel_listings * 2)
+        done = object()
+        task = loop.create_task(self._gather_async(bucket_name, listings, pages, done))
+        try:
+            while True:
+                page = loop.run_until_complete(pages.get())
+                if page is done:
+                    break
+                yield page
+            
+            # Surface any listing error
+            loop.run_until_complete(task)
+        finally:
+            # Cancel listings still parked on the queue, including siblings of a failed one
+            pending = asyncio.all_tasks(loop)
+            for pending_task in pending:
+                pending_task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+    
+    async def _gather_async(
+        self,
+        bucket_name: str,
+        listings: List[Tuple[str, Dict, Callable[[Dict], List[S3Object]]]],
+        pages: asyncio.Queue,
+        done: object
+    ):
+        """Run all listings concurrently on one aioboto3 client"""
+        session = aioboto3.Session(profile_name=self.profile) if self.profile else aioboto3.Session()
+        config = AioConfig(
+            max_pool_connections=max(32, self.max_parallel_listings),
+            retries={'max_attempts': 10, 'mode': 'adaptive'},
+            connect_timeout=5,
+            read_timeout=60
+        )
+        semaphore = asyncio.Semaphore(self.max_parallel_listings)
+        
+        async def list_prefix(s3_client, prefix: str, paginate_args: Dict, build_page):
+            async with semaphore:
+                logger.info(f"Listing prefix: {prefix}")
+                paginator = s3_client.get_paginator('list_objects_v2')
+                prefix_count = 0
+                async for page in paginator.paginate(
+                    Bucket=bucket_name,
+                    Prefix=prefix,
+                    PaginationConfig={'PageSize': 1000},
+                    **paginate_args
+                ):
+                    objects = build_page(page)
+                    prefix_count += len(objects)
+                    await pages.put(objects)
+                
+                logger.info(f"Found {prefix_count} objects under {prefix}")
+        
+        try:
+            async with session.client('s3', region_name=self.region, config=config) as s3_client:
+                tasks = [
+                    asyncio.ensure_future(list_prefix(s3_client, *listing))
+                    for listing in listings
+                ]
+                try:
+                    await asyncio.gather(*tasks)
+                finally:
+                    # gather leaves the siblings of a failed listing running, so stop
+                    # them before the client closes underneath them
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+        except Exception:
+            # Wake the consumer so it can surface the error; on cancellation the
+            # consumer has stopped reading, so don't wait on a full queue
+            await pages.put(done)
+            raise
+        await pages.put(done)
+    
+    def _page_objects(
+        self,
+        page: Dict,
+        year: int,
+        ext_tuple: Tuple[str, ...] = ('',),
+        fields: Optional[Set[str]] = None
+    ) -> List[S3Object]:
+        """Build records for the matching entries of one listing page"""
+        want_iso = fields is None or 'last_modified_iso' in fields
+        want_extension = fields is None or 'extension' in fields
+        objects = []
+        for obj in page.get('Contents', ()):
+            key = obj['Key']
+            if not key.lower().endswith(ext_tuple):
+                continue
+            
+            # Every key was listed under the year prefix, so no need to reparse it
+            objects.append(S3Object(
+                key=key,
+                size=obj['Size'],
+                last_modified=obj['LastModified'],
+                last_modified_iso=obj['LastModified'].isoformat() if want_iso else None,
+                storage_class=obj.get('StorageClass', 'STANDARD'),
+                extension=self._get_file_extension(key) if want_extension else None,
+                year=year
+            ))
         return objects
     
+    def _iter_parallel(
+        self,
+        producers: List[Callable[[], Iterable[List[S3Object]]]]
+    ) -> Generator[S3Object, None, None]:
+        """
+        Run page producers on a thread pool and yield their objects as pages arrive
+        A bounded queue keeps only a few pages per worker in memory
+        """
+        pages = queue.Queue(maxsize=self.max_parallel_listings * 2)
+        stop = threading.Event()
+        done = object()
+        
+        def put(item):
+            # Give up once the consumer has stopped reading
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        
+        def run(producer):
+            try:
+                for page in producer():
+                    if stop.is_set():
+                        return
+                    put(page)
+            finally:
+                put(done)
+        
+        with ThreadPoolExecutor(max_workers=self.max_parallel_listings) as executor:
+            futures = [executor.submit(run, producer) for producer in producers]
+            try:
+                remaining = len(futures)
+                while remaining:
+                    page = pages.get()
+                    if page is done:
+                        remaining -= 1
+                        continue
+                    yield from page
+                
+                # Surface any listing error raised in a worker
+                for future in futures:
+                    future.result()
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+    
     def list_objects_by_prefix_pattern(
         self,
         bucket_name: str,
         prefix_pattern: str,
-        max_objects: Optional[int] = None
-    ) -> Generator[Dict, None, None]:
+        max_objects: Optional[int] = None,
+        fields: Optional[Set[str]] = None
+    ) -> Generator[S3Object, None, None]:
         """
         Generator function to efficiently list objects by prefix pattern
         Useful for processing large datasets without loading everything into memory
+        fields names the optional record fields to fill (etag, last_modified_iso,
+        extension), None fills all of them
         """
         logger.info(f"Listing objects from {bucket_name} with prefix: {prefix_pattern}")
         
         try:
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            page_iterator = paginator.paginate(
-                Bucket=bucket_name,
-                Prefix=prefix_pattern
-            )
+            prefixes = self._discover_prefixes(bucket_name, prefix_pattern) if self.parallel_prefixes else []
+            if prefixes and self.use_async:
+                # Same fan-out as below, driven from one event loop
+                build_page = partial(self._prefix_page_objects, fields=fields)
+                listings = [(prefix_pattern, {'Delimiter': '/'}, build_page)]
+                listings.extend((prefix, {}, build_page) for prefix in prefixes)
+                objects = self._iter_parallel([partial(self._list_async, bucket_name, listings)])
+            elif prefixes:
+                # Objects directly under the root, then one listing per child prefix;
+                # objects arrive in completion order rather than key order
+                producers = [partial(self._list_prefix_pages, bucket_name, prefix_pattern, fields, '/')]
+                producers.extend(
+                    partial(self._list_prefix_pages, bucket_name, prefix, fields)
+                    for prefix in prefixes
+                )
+                objects = self._iter_parallel(producers)
+            else:
+                if self.use_async:
+                    logger.warning("Async listing only applies to parallel prefix listings, listing serially")
+                objects = chain.from_iterable(self._list_prefix_pages(bucket_name, prefix_pattern, fields))
             
             object_count = 0
-            for page in page_iterator:
-                if 'Contents' not in page:
-                    continue
-                    
-                for obj in page['Contents']:
+            for obj in objects:
+                if max_objects and object_count >= max_objects:
+                    logger.info(f"Reached maximum object limit: {max_objects}")
+                    return
+                
+                yield obj
+                object_count += 1
+            
+            logger.info(f"Processed {object_count} objects")
+            
+        except ClientError as e:
+            logger.error(f"Error listing objects: {e}")
+            raise
+    
+    def _discover_prefixes(self, bucket_name: str, root_prefix: str) -> List[str]:
+        """List the common prefixes one level below root_prefix"""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        page_iterator = paginator.paginate(Bucket=bucket_name, Prefix=root_prefix, Delimiter='/')
+        prefixes = list(page_iterator.search('CommonPrefixes[].Prefix'))
+        logger.info(f"Discovered {len(prefixes)} prefixes under '{root_prefix}'")
+        return prefixes
+    
+    def _list_prefix_pages(
+        self,
+        bucket_name: str,
+        prefix: str,
+        fields: Optional[Set[str]] = None,
+        delimiter: Optional[str] = None
+    ) -> Generator[List[S3Object], None, None]:
+        """Yield the objects under one prefix, one list per page"""
+        paginate_args = {'Delimiter': delimiter} if delimiter else {}
+        
+        # Paginators are not thread-safe, so each worker creates its own
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        page_iterator = paginator.paginate(
+            Bucket=bucket_name,
+            Prefix=prefix,
+            PaginationConfig={'PageSize': 1000},
+            **paginate_args
+        )
+        
+        for page in page_iterator:
+            yield self._prefix_page_objects(page, fields)
+    
+    def _prefix_page_objects(self, page: Dict, fields: Optional[Set[str]] = None) -> List[S3Object]:
+        """Build records for every entry of one prefix listing page"""
+        # Skip per-object work for fields the caller won't read
+        want_etag = fields is None or 'etag' in fields
+        want_iso = fields is None or 'last_modified_iso' in fields
+        want_extension = fields is None or 'extension' in fields
+        return [
+            S3Object(
+                key=obj['Key'],
+                size=obj['Size'],
+                last_modified=obj['LastModified'],
+                last_modified_iso=obj['LastModified'].isoformat() if want_iso else None,
+                storage_class=obj.get('StorageClass', 'STANDARD'),
+                extension=self._get_file_extension(obj['Key']) if want_extension else None,
+                etag=obj['ETag'].strip('"') if want_etag else None
+            )
+            for obj in page.get('Contents', ())
+        ]
+    
+    def list_via_inventory(
+        self,
+        bucket_name: str,
+        inventory_uri: str,
+        prefix: str = "",
+        max_objects: Optional[int] = None,
+        fields: Optional[Set[str]] = None
+    ) -> Generator[S3Object, None, None]:
+        """
+        Generator listing objects from the latest S3 Inventory report
+        Reads the report files instead of paging through ListObjectsV2, and falls
+        back to live listing when no usable inventory is found
+        """
+        logger.info(f"Reading S3 Inventory for {bucket_name} from {inventory_uri}")
+        
+        # ETag is an optional inventory field, so only require it when asked for
+        required = ['Size', 'LastModifiedDate']
+        if fields is not None and 'etag' in fields:
+            required.append('ETag')
+        
+        manifest = self._load_inventory_manifest(inventory_uri)
+        fallback_reason = None
+        if manifest is None:
+            fallback_reason = "no inventory manifest found"
+        elif manifest.get('sourceBucket') != bucket_name:
+            fallback_reason = f"inventory is for bucket {manifest.get('sourceBucket')}"
+        elif manifest['fileFormat'] != 'CSV' and not HAVE_PYARROW:
+            fallback_reason = f"pyarrow is required to read {manifest['fileFormat']} inventory"
+        else:
+            if manifest['fileFormat'] == 'CSV':
+                schema = [field.strip() for field in manifest['fileSchema'].split(',')]
+                missing = [name for name in required if name not in schema]
+            else:
+                # Parquet and ORC schemas are message/struct definitions naming each column
+                columns = set(re.findall(r'\w+', manifest['fileSchema']))
+                missing = [name for name in required if INVENTORY_COLUMNS[name] not in columns]
+            if missing:
+                fallback_reason = f"inventory does not include {', '.join(missing)}"
+        
+        if fallback_reason:
+            logger.warning(f"Falling back to live listing: {fallback_reason}")
+            yield from self.list_objects_by_prefix_pattern(bucket_name, prefix, max_objects, fields)
+            return
+        
+        # Report files live in the destination bucket named by the manifest
+        data_bucket = manifest['destinationBucket'].split(':::')[-1]
+        if manifest['fileFormat'] == 'CSV':
+            read_file = partial(self._read_inventory_csv, data_bucket, schema=schema)
+        else:
+            read_file = partial(self._read_inventory_columnar, data_bucket, file_format=manifest['fileFormat'])
+        
+        want_iso = fields is None or 'last_modified_iso' in fields
+        want_extension = fields is None or 'extension' in fields
+        
+        object_count = 0
+        try:
+            for inventory_file in manifest['files']:
+                for key, size, last_modified, etag, storage_class in read_file(inventory_file['key']):
+                    if not key.startswith(prefix):
+                        continue
                     if max_objects and object_count >= max_objects:
                         logger.info(f"Reached maximum object limit: {max_objects}")
                         return
                     
-                    yield {
-                        'Key': obj['Key'],
-                        'Size': obj['Size'],
-                        'LastModified': obj['LastModified'],
-                        'StorageClass': obj.get('StorageClass', 'STANDARD'),
-                        'ETag': obj['ETag'].strip('"'),
-                        'Extension': self._get_file_extension(obj['Key'])
-                    }
+                    yield S3Object(
+                        key=key,
+                        size=size,
+                        last_modified=last_modified,
+                        last_modified_iso=last_modified.isoformat() if want_iso else None,
+                        storage_class=storage_class or 'STANDARD',
+                        extension=self._get_file_extension(key) if want_extension else None,
+                        etag=etag
+                    )
                     object_count += 1
             
-            logger.info(f"Processed {object_count} objects")
+            logger.info(f"Processed {object_count} objects from inventory")
             
         except ClientError as e:
-            logger.error(f"Error listing objects: {e}")
+            logger.error(f"Error reading inventory: {e}")
             raise
     
-    def get_bucket_statistics(self, bucket_name: str, prefix: str = "") -> Dict:
+    def _load_inventory_manifest(self, inventory_uri: str) -> Optional[Dict]:
+        """
+        Load an inventory manifest.json, given either its own URI or the inventory
+        configuration prefix, in which case the latest report is used
+        """
+        parsed = urlparse(inventory_uri)
+        bucket, key = parsed.netloc, parsed.path.lstrip('/')
+        
+        if key.endswith('manifest.json'):
+            manifest_keys = [key]
+        else:
+            base = key if not key or key.endswith('/') else f"{key}/"
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            folders = paginator.paginate(Bucket=bucket, Prefix=base, Delimiter='/').search('CommonPrefixes[].Prefix')
+            # Report folders are named by their timestamp, so the latest sorts last;
+            # data/ and hive/ are skipped
+            manifest_keys = [
+                f"{folder}manifest.json"
+                for folder in sorted(
+                    (folder for folder in folders if folder[len(base):][:1].isdigit()),
+                    reverse=True
+                )
+            ]
+        
+        # A report still being delivered has no manifest yet, so try older ones
+        for manifest_key in manifest_keys:
+            try:
+                response = self.s3_client.get_object(Bucket=bucket, Key=manifest_key)
+            except ClientError as e:
+                if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                    continue
+                raise
+            logger.info(f"Using inventory manifest: s3://{bucket}/{manifest_key}")
+            return json.loads(response['Body'].read())
+        
+        return None
+    
+    def _read_inventory_csv(
+        self,
+        bucket_name: str,
+        key: str,
+        schema: List[str]
+    ) -> Generator[Tuple, None, None]:
+        """Stream (key, size, last_modified, etag, storage_class) rows from a gzipped CSV report"""
+        column = {name: i for i, name in enumerate(schema)}
+        key_i = column['Key']
+        size_i = column['Size']
+        modified_i = column['LastModifiedDate']
+        etag_i = column.get('ETag')
+        class_i = column.get('StorageClass')
+        latest_i = column.get('IsLatest')
+        marker_i = column.get('IsDeleteMarker')
+        
+        body = self.s3_client.get_object(Bucket=bucket_name, Key=key)['Body']
+        with gzip.open(body, 'rt', encoding='utf-8', newline='') as report:
+            for row in csv.reader(report):
+                # Only current versions of live objects
+                if latest_i is not None and row[latest_i] != 'true':
+                    continue
+                if marker_i is not None and row[marker_i] == 'true':
+                    continue
+                
+                yield (
+                    # CSV reports URL-encode keys
+                    unquote_plus(row[key_i]),
+                    int(row[size_i]),
+                    datetime.fromisoformat(row[modified_i].rstrip('Z')).replace(tzinfo=timezone.utc),
+                    row[etag_i] if etag_i is not None else None,
+                    row[class_i] if class_i is not None else None
+                )
+    
+    def _read_inventory_columnar(
+        self,
+        bucket_name: str,
+        key: str,
+        file_format: str
+    ) -> Generator[Tuple, None, None]:
+        """Stream (key, size, last_modified, etag, storage_class) rows from a Parquet or ORC report"""
+        with tempfile.TemporaryFile() as report:
+            self.s3_client.download_fileobj(bucket_name, key, report)
+            report.seek(0)
+            
+            if file_format == 'Parquet':
+                parquet_file = pq.ParquetFile(report)
+                names = set(parquet_file.schema_arrow.names)
+                columns = [c for c in INVENTORY_COLUMNS.values() if c in names]
+                batches = parquet_file.iter_batches(columns=columns)
+            else:
+                from pyarrow import orc
+                orc_file = orc.ORCFile(report)
+                names = set(orc_file.schema.names)
+                columns = [c for c in INVENTORY_COLUMNS.values() if c in names]
+                batches = (orc_file.read_stripe(i, columns=columns) for i in range(orc_file.nstripes))
+            
+            # Columns are decoded a batch at a time, absent optional ones read as None
+            for batch in batches:
+                data = batch.to_pydict()
+                rows = zip(
+                    data['key'],
+                    data['size'],
+                    data['last_modified_date'],
+                    data.get('e_tag', repeat(None)),
+                    data.get('storage_class', repeat(None)),
+                    data.get('is_latest', repeat(None)),
+                    data.get('is_delete_marker', repeat(None))
+                )
+                for key_value, size, last_modified, etag, storage_class, is_latest, is_delete_marker in rows:
+                    if is_latest is False or is_delete_marker:
+                        continue
+                    yield key_value, size, last_modified, etag, storage_class
+    
+    def get_bucket_statistics(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        inventory_uri: Optional[str] = None
+    ) -> Dict:
         """
         Generate comprehensive bucket statistics
         Useful for capacity planning and cost analysis
+        Reads the S3 Inventory report instead of listing when inventory_uri is given
         """
         logger.info(f"Generating statistics for bucket: {bucket_name}")
         
@@ -183,43 +745,64 @@ class S3KeyLister:
         }
         
         try:
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            page_iterator = paginator.paginate(
-                Bucket=bucket_name,
-                Prefix=prefix
-            )
+            if inventory_uri:
+                # Inventory records are folded in batches of the same size as a page
+                objects = self.list_via_inventory(bucket_name, inventory_uri, prefix, fields=set())
+                pages = iter(lambda: list(islice(objects, 1000)), [])
+                get_size = attrgetter('size')
+                get_key = attrgetter('key')
+                get_storage_class = attrgetter('storage_class')
+                get_last_modified = attrgetter('last_modified')
+            else:
+                paginator = self.s3_client.get_paginator('list_objects_v2')
+                page_iterator = paginator.paginate(
+                    Bucket=bucket_name,
+                    Prefix=prefix,
+                    PaginationConfig={'PageSize': 1000}
+                )
+                pages = (page.get('Contents') for page in page_iterator)
+                get_size = itemgetter('Size')
+                get_key = itemgetter('Key')
+                get_last_modified = itemgetter('LastModified')
+                
+                def get_storage_class(obj):
+                    return obj.get('StorageClass', 'STANDARD')
+            
+            storage_classes = Counter()
+            extensions = Counter()
+            size_buckets = Counter()
+            size_bucket = partial(bisect_right, SIZE_BUCKET_BOUNDS)
             
-            for page in page_iterator:
-                if 'Contents' not in page:
+            # Fold each page with C-level builtins rather than per-object branches
+            for contents in pages:
+                if not contents:
                     continue
-                    
-                for obj in page['Contents']:
-                    stats['total_objects'] += 1
-                    size = obj['Size']
-                    stats['total_size_bytes'] += size
-                    
-                    # Storage class distribution
-                    storage_class = obj.get('StorageClass', 'STANDARD')
-                    stats['storage_classes'][storage_class] = stats['storage_classes'].get(storage_class, 0) + 1
-                    
-                    # Extension distribution
-                    ext = self._get_file_extension(obj['Key'])
-                    stats['extensions'][ext] = stats['extensions'].get(ext, 0) + 1
-                    
-                    # Size distribution
-                    if size < 1024 * 1024:  # < 1MB
-                        stats['size_distribution']['small_files'] += 1
-                    elif size < 100 * 1024 * 1024:  # < 100MB
-                        stats['size_distribution']['medium_files'] += 1
-                    else:
-                        stats['size_distribution']['large_files'] += 1
-                    
-                    # Track oldest and newest objects
-                    last_modified = obj['LastModified']
-                    if stats['oldest_object'] is None or last_modified < stats['oldest_object']:
-                        stats['oldest_object'] = last_modified
-                    if stats['newest_object'] is None or last_modified > stats['newest_object']:
-                        stats['newest_object'] = last_modified
+                
+                sizes = list(map(get_size, contents))
+                stats['total_objects'] += len(sizes)
+                stats['total_size_bytes'] += sum(sizes)
+                
+                # Storage class, extension and size distributions
+                storage_classes.update(map(get_storage_class, contents))
+                extensions.update(map(self._get_file_extension, map(get_key, contents)))
+                size_buckets.update(map(size_bucket, sizes))
+                
+                # Track oldest and newest objects
+                last_modified = list(map(get_last_modified, contents))
+                page_oldest = min(last_modified)
+                page_newest = max(last_modified)
+                if stats['oldest_object'] is None or page_oldest < stats['oldest_object']:
+                    stats['oldest_object'] = page_oldest
+                if stats['newest_object'] is None or page_newest > stats['newest_object']:
+                    stats['newest_object'] = page_newest
+            
+            stats['storage_classes'] = dict(storage_classes)
+            stats['extensions'] = dict(extensions)
+            stats['size_distribution'] = {
+                'small_files': size_buckets[0],
+                'medium_files': size_buckets[1],
+                'large_files': size_buckets[2]
+            }
             
             # Convert datetime objects to ISO format for JSON serialization
             if stats['oldest_object']:
@@ -237,30 +820,43 @@ class S3KeyLister:
             logger.error(f"Error generating statistics: {e}")
             raise
     
-    def export_to_csv(self, objects: List[Dict], filename: str):
-        """Export object list to CSV file"""
-        logger.info(f"Exporting {len(objects)} objects to CSV: {filename}")
+    def export_to_csv(self, objects: Iterable[S3Object], filename: str):
+        """Export objects to CSV file, writing rows as they are produced"""
+        logger.info(f"Exporting objects to CSV: {filename}")
         
-        if not objects:
+        objects = iter(objects)
+        first = next(objects, None)
+        if first is None:
             logger.warning("No objects to export")
             return
         
         fieldnames = ['Key', 'Size', 'LastModified', 'StorageClass', 'Extension']
-        if 'Year' in objects[0]:
+        include_year = first.year is not None
+        if include_year:
             fieldnames.append('Year')
         
         try:
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
                 
-                for obj in objects:
-                    # Format datetime for CSV
-                    if isinstance(obj.get('LastModified'), datetime):
-                        obj['LastModified'] = obj['LastModified'].isoformat()
-                    writer.writerow(obj)
+                # zip advances the counter once per object actually written
+                counter = count()
+                objects = (obj for obj, _ in zip(chain([first], objects), counter))
+                if include_year:
+                    rows = (
+                        (obj.key, obj.size, obj.last_modified_iso, obj.storage_class, obj.extension, obj.year)
+                        for obj in objects
+                    )
+                else:
+                    rows = (
+                        (obj.key, obj.size, obj.last_modified_iso, obj.storage_class, obj.extension)
+                        for obj in objects
+                    )
+                writer.writerows(rows)
+                row_count = next(counter)
             
-            logger.info(f"CSV export completed: {filename}")
+            logger.info(f"CSV export completed: {row_count} objects written to {filename}")
             
         except Exception as e:
             logger.error(f"Error exporting to CSV: {e}")
@@ -271,8 +867,13 @@ class S3KeyLister:
         logger.info(f"Exporting data to JSON: {filename}")
         
         try:
-            with open(filename, 'w', encoding='utf-8') as jsonfile:
-                json.dump(data, jsonfile, indent=2, default=str)
+            if HAVE_ORJSON:
+                # orjson encodes datetimes natively, so default only sees odd types
+                with open(filename, 'wb') as jsonfile:
+                    jsonfile.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
+            else:
+                with open(filename, 'w', encoding='utf-8') as jsonfile:
+                    json.dump(data, jsonfile, indent=2, default=str)
             
             logger.info(f"JSON export completed: {filename}")
             
@@ -280,34 +881,116 @@ class S3KeyLister:
             logger.error(f"Error exporting to JSON: {e}")
             raise
     
-    def find_duplicate_objects(self, bucket_name: str, prefix: str = "") -> Dict[str, List[str]]:
+    def export_objects_to_json(self, objects: Iterable[S3Object], filename: str):
+        """Stream objects to a JSON file as {"objects": [...]}, one record per line"""
+        logger.info(f"Exporting objects to JSON: {filename}")
+        
+        # Encode each record on its own so the listing is never held in memory
+        if HAVE_MSGSPEC:
+            encoder = msgspec.json.Encoder()
+            
+            def encode(obj):
+                return encoder.encode(S3ObjectJSON(
+                    obj.key, obj.size, obj.last_modified_iso, obj.storage_class,
+                    obj.extension, obj.etag, obj.year
+                ))
+        elif HAVE_ORJSON:
+            def encode(obj):
+                return orjson.dumps(obj.to_dict())
+        else:
+            def encode(obj):
+                return json.dumps(obj.to_dict(), default=str).encode('utf-8')
+        
+        try:
+            with open(filename, 'wb') as jsonfile:
+                jsonfile.write(b'{"objects": [')
+                separator = b'\n'
+                row_count = 0
+                for obj in objects:
+                    jsonfile.write(separator)
+                    jsonfile.write(encode(obj))
+                    separator = b',\n'
+                    row_count += 1
+                jsonfile.write(b'\n]}\n')
+            
+            logger.info(f"JSON export completed: {row_count} objects written to {filename}")
+            
+        except Exception as e:
+            logger.error(f"Error exporting to JSON: {e}")
+            raise
+    
+    def write_keys(self, objects: Iterable[S3Object]):
+        """Write object keys to stdout, one per line, in 64KB batches"""
+        out = sys.stdout.buffer
+        batch = bytearray()
+        for obj in objects:
+            batch += obj.key.encode()
+            batch += b'\n'
+            if len(batch) > 65536:
+                out.write(batch)
+                batch.clear()
+        out.write(batch)
+        out.flush()
+    
+    def find_duplicate_objects(
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        db_dir: Optional[str] = None,
+        inventory_uri: Optional[str] = None
+    ) -> Dict[Tuple[str, int], List[str]]:
         """
         Find potential duplicate objects based on size and ETag
         Useful for storage optimization and deduplication
+        Objects are staged in SQLite, in memory unless db_dir is given, in which case
+        a private scratch file there bounds memory on huge buckets
+        Reads the S3 Inventory report instead of listing when inventory_uri is given
         """
         logger.info(f"Finding duplicate objects in bucket: {bucket_name}")
         
-        objects_by_etag = {}
-        duplicates = {}
+        db_path = ":memory:"
+        if db_dir is not None:
+            fd, db_path = tempfile.mkstemp(prefix='s3-dedup-', suffix='.sqlite', dir=db_dir)
+            os.close(fd)
         
+        conn = sqlite3.connect(db_path)
         try:
-            for obj in self.list_objects_by_prefix_pattern(bucket_name, prefix):
-                etag = obj['ETag']
-                size = obj['Size']
-                key = obj['Key']
-                
-                # Use ETag + Size as duplicate identifier
-                duplicate_key = f"{etag}:{size}"
-                
-                if duplicate_key not in objects_by_etag:
-                    objects_by_etag[duplicate_key] = []
-                
-                objects_by_etag[duplicate_key].append(key)
+            # Scratch table only, so skip journaling and fsyncs
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE s3_objects (etag TEXT, size INTEGER, key TEXT)")
+            
+            if inventory_uri:
+                objects = self.list_via_inventory(bucket_name, inventory_uri, prefix, fields={'etag'})
+            else:
+                objects = self.list_objects_by_prefix_pattern(bucket_name, prefix, fields={'etag'})
+            while True:
+                batch = [(obj.etag, obj.size, obj.key) for obj in islice(objects, 1000)]
+                if not batch:
+                    break
+                conn.executemany("INSERT INTO s3_objects VALUES (?, ?, ?)", batch)
+            
+            # Use ETag + Size as duplicate identifier; the index serves both the
+            # group-by and the join back to the keys. Sets come back in the order
+            # their first key was listed
+            conn.execute("CREATE INDEX s3_objects_etag_size ON s3_objects (etag, size)")
+            rows = conn.execute(
+                """
+                SELECT o.etag, o.size, o.key
+                FROM s3_objects o
+                JOIN (
+                    SELECT etag, size, min(rowid) AS first_seen FROM s3_objects
+                    GROUP BY etag, size HAVING count(*) > 1
+                ) d ON o.etag = d.etag AND o.size = d.size
+                ORDER BY d.first_seen, o.rowid
+                """
+            )
             
             # Find actual duplicates (more than one object with same ETag+Size)
-            for duplicate_key, keys in objects_by_etag.items():
-                if len(keys) > 1:
-                    duplicates[duplicate_key] = keys
+            duplicates = {
+                duplicate_key: [key for _, _, key in group]
+                for duplicate_key, group in groupby(rows, key=itemgetter(0, 1))
+            }
             
             logger.info(f"Found {len(duplicates)} sets of potential duplicates")
             return duplicates
@@ -315,20 +998,26 @@ class S3KeyLister:
         except ClientError as e:
             logger.error(f"Error finding duplicates: {e}")
             raise
+        finally:
+            conn.close()
+            if db_dir is not None:
+                os.remove(db_path)
     
     def _get_file_extension(self, key: str) -> str:
         """Extract file extension from S3 key"""
-        if '.' in key:
-            return '.' + key.split('.')[-1].lower()
-        return 'no_extension'
+        # Scan from the tail; a dot before the last '/' belongs to a folder name
+        i = key.rfind('.')
+        if i < 0 or '/' in key[i:]:
+            return 'no_extension'
+        return key[i:].lower()
     
     def _format_bytes(self, bytes_value: int) -> str:
         """Format bytes into human-readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if bytes_value < 1024.0:
-                return f"{bytes_value:.2f} {unit}"
-            bytes_value /= 1024.0
-        return f"{bytes_value:.2f} PB"
+        if bytes_value <= 0:
+            return "0.00 B"
+        # Each unit spans 10 bits, so the bit length picks the unit directly
+        i = min((int(bytes_value).bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{bytes_value / (1 << (10 * i)):.2f} {SIZE_UNITS[i]}"
 
 def main():
     """Main CLI interface"""
@@ -348,6 +1037,9 @@ Examples:
 
   # Export to CSV with custom prefix
   %(prog)s --bucket my-bucket --prefix UNDANG-UNDANG/ --output-csv objects.csv
+
+  # Read the latest S3 Inventory report instead of listing the bucket
+  %(prog)s --bucket my-bucket --use-inventory s3://inventory-bucket/my-bucket/daily/ --output-csv objects.csv
         """
     )
     
@@ -359,24 +1051,54 @@ Examples:
     parser.add_argument('--max-objects', type=int, help='Maximum number of objects to process')
     parser.add_argument('--region', default='us-east-1', help='AWS region')
     parser.add_argument('--profile', help='AWS profile to use')
+    parser.add_argument('--max-parallel-listings', type=int, default=8,
+                        help='Maximum number of prefixes listed concurrently')
+    parser.add_argument('--use-inventory', metavar='S3_URI',
+                        help='Read objects from the S3 Inventory at this prefix or manifest.json')
+    parser.add_argument('--parallel-prefixes', action='store_true',
+                        help='Discover child prefixes with a delimiter listing and list them concurrently')
+    parser.add_argument('--async-listing', action='store_true',
+                        help='Run year-range and --parallel-prefixes listings on an aioboto3 event loop (for very many prefixes)')
     parser.add_argument('--output-csv', help='Export results to CSV file')
     parser.add_argument('--output-json', help='Export results to JSON file')
     parser.add_argument('--stats-only', action='store_true', help='Generate bucket statistics only')
     parser.add_argument('--find-duplicates', action='store_true', help='Find duplicate objects')
+    parser.add_argument('--dedup-dir',
+                        help='Directory for an on-disk SQLite scratch file used by duplicate detection '
+                             '(default: in memory)')
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
     
+    # Year listings rely on the year prefixes, which an inventory report doesn't have
+    if args.use_inventory and args.start_year and args.end_year:
+        parser.error("--use-inventory cannot be combined with --start-year/--end-year")
+    
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Initialize S3 lister
-    lister = S3KeyLister(region=args.region, profile=args.profile)
+    lister = S3KeyLister(
+        region=args.region,
+        profile=args.profile,
+        max_parallel_listings=args.max_parallel_listings,
+        use_async=args.async_listing,
+        parallel_prefixes=args.parallel_prefixes
+    )
+    
+    # Listings only fill the optional fields the chosen output reads;
+    # key-only output skips all of them
+    if args.output_csv:
+        fields = {'last_modified_iso', 'extension'}
+    elif args.output_json:
+        fields = None
+    else:
+        fields = set()
     
     try:
         if args.stats_only:
             # Generate statistics only
-            stats = lister.get_bucket_statistics(args.bucket, args.prefix)
+            stats = lister.get_bucket_statistics(args.bucket, args.prefix, args.use_inventory)
             
             if args.output_json:
                 lister.export_to_json(stats, args.output_json)
@@ -385,12 +1107,17 @@ Examples:
         
         elif args.find_duplicates:
             # Find duplicate objects
-            duplicates = lister.find_duplicate_objects(args.bucket, args.prefix)
+            duplicates = lister.find_duplicate_objects(
+                args.bucket,
+                args.prefix,
+                args.dedup_dir,
+                args.use_inventory
+            )
             
             if duplicates:
                 print(f"Found {len(duplicates)} sets of potential duplicates:")
-                for duplicate_key, keys in duplicates.items():
-                    print(f"\nDuplicate set ({duplicate_key}):")
+                for (etag, size), keys in duplicates.items():
+                    print(f"\nDuplicate set ({etag}:{size}):")
                     for key in keys:
                         print(f"  - {key}")
             else:
@@ -403,32 +1130,42 @@ Examples:
                 args.start_year, 
                 args.end_year,
                 args.prefix,
-                args.extensions
+                args.extensions,
+                fields
             )
             
             if args.output_csv:
                 lister.export_to_csv(objects, args.output_csv)
             elif args.output_json:
-                lister.export_to_json({'objects': objects}, args.output_json)
+                lister.export_objects_to_json(objects, args.output_json)
             else:
-                for obj in objects:
-                    print(obj['Key'])
+                lister.write_keys(objects)
         
         else:
-            # List objects by prefix pattern
-            objects = list(lister.list_objects_by_prefix_pattern(
-                args.bucket, 
-                args.prefix, 
-                args.max_objects
-            ))
+            # List objects by prefix pattern, or from the inventory report
+            if args.use_inventory:
+                objects = lister.list_via_inventory(
+                    args.bucket,
+                    args.use_inventory,
+                    args.prefix,
+                    args.max_objects,
+                    fields
+                )
+            else:
+                objects = lister.list_objects_by_prefix_pattern(
+                    args.bucket, 
+                    args.prefix, 
+                    args.max_objects,
+                    fields
+                )
             
             if args.output_csv:
                 lister.export_to_csv(objects, args.output_csv)
             elif args.output_json:
-                lister.export_to_json({'objects': objects}, args.output_json)
+                lister.export_objects_to_json(objects, args.output_json)
             else:
-                for obj in objects:
-                    print(obj['Key'])
+                # Stream keys as pages arrive instead of buffering the listing
+                lister.write_keys(objects)
     
     except KeyboardInterrupt:
         logger.info("Operation cancelled by user")